@@ -5,7 +5,9 @@ import os
 from datetime import datetime, timedelta
 import pandas as pd
 import io
+import threading
 from werkzeug.utils import secure_filename
+import assets
 import secrets
 import hashlib
 
@@ -24,6 +26,9 @@ app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(seconds=SESSION_TIMEOUT)
 
+# Fingerprinted, precompressed static files (see assets.py)
+assets.init_app(app)
+
 # --- HELPER FUNCTIONS ---
 def init_db():
     """Initialize data file with ALL required sections including users."""
@@ -82,9 +87,16 @@ def load_data():
         return json.load(f)
 
 def save_data(data):
-    """Save data to JSON file."""
-    with open(DATA_FILE, 'w') as f:
-        json.dump(data, f, indent=4)
+    """Save data to JSON file atomically so readers and snapshots never see a partial write."""
+    tmp_file = f"{DATA_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_file, 'w') as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp_file, DATA_FILE)
+    except Exception:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
 
 def allowed_file(filename):
     """Check if file extension is allowed."""
@@ -256,7 +268,10 @@ def upload_cv():
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         new_filename = f"{candidate_id}_{timestamp}_{original_filename}"
         
-        file.save(os.path.join(app.config['UPLOAD_FOLDER'], new_filename))
+        # Save under a hidden temp name first so snapshots only pick up complete files
+        tmp_path = os.path.join(app.config['UPLOAD_FOLDER'], f".{new_filename}.tmp")
+        file.save(tmp_path)
+        os.replace(tmp_path, os.path.join(app.config['UPLOAD_FOLDER'], new_filename))
         
         # Log file upload
         current_user = session.get('user_id', 'Unknown')
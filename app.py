@@ -4,7 +4,9 @@ import os
 from datetime import datetime
 import pandas as pd
 import io
+import threading
 from werkzeug.utils import secure_filename
+import assets
 
 app = Flask(__name__)
 
@@ -15,6 +17,9 @@ ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'png', 'jpg', 'jpeg'}
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
+# Fingerprinted, precompressed static files (see assets.py)
+assets.init_app(app)
+
 # --- HELPER FUNCTIONS ---
 def init_db():
     """Initialize data file with ALL required sections."""
@@ -41,8 +46,15 @@ def load_data():
         return json.load(f)
 
 def save_data(data):
-    with open(DATA_FILE, 'w') as f:
-        json.dump(data, f, indent=4)
+    tmp_file = f"{DATA_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_file, 'w') as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp_file, DATA_FILE)
+    except Exception:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
 
 def allowed_file(filename):
     return '.' in filename and \
@@ -103,7 +115,10 @@ def upload_cv():
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         new_filename = f"{timestamp}_{original_filename}"
         
-        file.save(os.path.join(app.config['UPLOAD_FOLDER'], new_filename))
+        # Save under a hidden temp name first so snapshots only pick up complete files
+        tmp_path = os.path.join(app.config['UPLOAD_FOLDER'], f".{new_filename}.tmp")
+        file.save(tmp_path)
+        os.replace(tmp_path, os.path.join(app.config['UPLOAD_FOLDER'], new_filename))
         
         return jsonify({'status': 'success', 'filename': new_filename})
     
@@ -0,0 +1,334 @@
+"""Static asset build pipeline: minify, fingerprint and precompress.
+
+Usage:
+    python assets.py build
+
+The build reads the JS, CSS and images in the static folder, writes
+content-hashed copies (e.g. script.3f9a1c0b2d.js) plus .gz/.br versions to
+the dist folder, and records the mapping in dist/manifest.json. Templates
+call asset_url('script.js') to get the hashed URL, and the /assets/ route
+serves those files with immutable cache headers, ETags and 304 support.
+init_app() runs the build on every start.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import sys
+
+from flask import abort, request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always produced
+    brotli = None
+
+# --- CONFIGURATION ---
+STATIC_FOLDER = 'static'
+ASSET_FOLDER = 'dist'
+MANIFEST_FILE = os.path.join(ASSET_FOLDER, 'manifest.json')
+ASSET_URL_PREFIX = '/assets'
+MINIFY_EXTENSIONS = {'.js', '.css'}
+COPY_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.webp', '.woff', '.woff2'}
+COMPRESS_EXTENSIONS = {'.js', '.css', '.svg'}
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+_manifest_cache = {'mtime': None, 'assets': {}, 'hashed_names': set()}
+
+
+# --- MINIFIERS ---
+def _read_quoted(source, i):
+    """Return the index just past the string literal starting at source[i]."""
+    quote = source[i]
+    i += 1
+    while i < len(source) and source[i] != quote and source[i] != '\n':
+        i += 2 if source[i] == '\\' else 1
+    return i + 1
+
+# A '/' after one of these starts a regex literal; anywhere else it is division
+REGEX_AFTER_PUNCTUATION = set('(,=:[!&|?{};+-*/%<>~^')
+REGEX_AFTER_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete',
+                        'void', 'throw', 'instanceof', 'yield', 'await'}
+
+def _read_regex(source, i):
+    """Return the index just past the regex literal (and flags) starting at source[i]."""
+    in_class = False
+    i += 1
+    while i < len(source) and source[i] != '\n':
+        c = source[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            i += 1
+            break
+        i += 1
+    while i < len(source) and (source[i].isalnum() or source[i] in '_$'):
+        i += 1
+    return i
+
+def minify_js(source):
+    """Strip comments and indentation from JavaScript.
+
+    Line breaks are kept so automatic semicolon insertion still behaves the
+    same. String, template and regex literals are copied untouched; the last
+    significant token decides whether a '/' starts a regex or is division.
+    """
+    out = []
+    templates = []  # brace depth for each open ${ ... } inside a template literal
+    in_template = False
+    last = ''  # last significant token outside literals
+    i = 0
+    n = len(source)
+
+    def separator(ws):
+        # Collapse whitespace between tokens to one space or one newline
+        if not out:
+            return
+        if out[-1] in (' ', '\n'):
+            if ws == '\n':
+                out[-1] = ws
+            return
+        out.append(ws)
+
+    while i < n:
+        c = source[i]
+
+        if in_template:
+            start = i
+            while i < n and source[i] != '`' and not source.startswith('${', i):
+                i += 2 if source[i] == '\\' else 1
+            out.append(source[start:i])
+            if source.startswith('${', i):
+                out.append('${')
+                templates.append(0)
+                in_template = False
+                last = '{'
+                i += 2
+            elif i < n:
+                out.append('`')
+                in_template = False
+                last = '`'
+                i += 1
+            continue
+
+        if c in '"\'':
+            end = _read_quoted(source, i)
+            out.append(source[i:end])
+            last = c
+            i = end
+        elif c == '`':
+            out.append('`')
+            in_template = True
+            i += 1
+        elif source.startswith('//', i):
+            while i < n and source[i] != '\n':
+                i += 1
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = n if end == -1 else end + 2
+            separator('\n' if '\n' in source[i:end] else ' ')
+            i = end
+        elif c == '/' and (last == '' or last in REGEX_AFTER_PUNCTUATION or last in REGEX_AFTER_KEYWORDS):
+            end = _read_regex(source, i)
+            out.append(source[i:end])
+            last = 'regex'
+            i = end
+        elif c.isspace():
+            start = i
+            while i < n and source[i].isspace():
+                i += 1
+            separator('\n' if '\n' in source[start:i] else ' ')
+        elif c == '\\':
+            out.append(source[i:i + 2])
+            last = 'identifier'
+            i += 2
+        elif c.isalnum() or c in '_$':
+            start = i
+            while i < n and (source[i].isalnum() or source[i] in '_$'):
+                i += 1
+            last = source[start:i]
+            out.append(last)
+        else:
+            if templates:
+                if c == '{':
+                    templates[-1] += 1
+                elif c == '}':
+                    if templates[-1] == 0:
+                        templates.pop()
+                        out.append('}')
+                        in_template = True
+                        i += 1
+                        continue
+                    templates[-1] -= 1
+            # a++ / b and a-- / b are division, not a regex
+            last = c * 2 if c in '+-' and out and out[-1] == c else c
+            out.append(c)
+            i += 1
+
+    return ''.join(out).strip() + '\n'
+
+def minify_css(source):
+    """Strip comments and redundant whitespace from CSS."""
+    out = []
+    i = 0
+    n = len(source)
+
+    while i < n:
+        c = source[i]
+        if c in '"\'':
+            end = _read_quoted(source, i)
+            out.append(source[i:end])
+            i = end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+        elif c.isspace():
+            while i < n and source[i].isspace():
+                i += 1
+            previous = out[-1][-1:] if out else ''
+            following = source[i:i + 1]
+            if previous not in ('', '{', '}', ';', ',', ':') and following not in ('', '{', '}', ';', ','):
+                out.append(' ')
+        else:
+            if c in '{};,' and out and out[-1] == ' ':
+                out.pop()
+            out.append(c)
+            i += 1
+
+    return ''.join(out).replace(';}', '}')
+
+MINIFIERS = {'.js': minify_js, '.css': minify_css}
+
+
+# --- BUILD ---
+def fingerprint(relative_path, content):
+    """Return relative_path with a short content hash before the extension."""
+    stem, ext = os.path.splitext(relative_path)
+    digest = hashlib.sha256(content).hexdigest()[:10]
+    return f"{stem}.{digest}{ext}".replace(os.sep, '/')
+
+def _write_if_missing(path, content):
+    """Write a build output once; hashed names never change content."""
+    if os.path.exists(path):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+def build_assets(static_folder=STATIC_FOLDER, asset_folder=ASSET_FOLDER):
+    """Build every asset in static_folder into asset_folder. Returns the manifest."""
+    manifest = {}
+    for root, _, files in os.walk(static_folder):
+        for filename in sorted(files):
+            ext = os.path.splitext(filename)[1].lower()
+            if ext not in MINIFY_EXTENSIONS and ext not in COPY_EXTENSIONS:
+                continue
+            src = os.path.join(root, filename)
+            relative_path = os.path.relpath(src, static_folder)
+
+            with open(src, 'rb') as f:
+                content = f.read()
+            if ext in MINIFIERS:
+                content = MINIFIERS[ext](content.decode('utf-8')).encode('utf-8')
+
+            hashed_name = fingerprint(relative_path, content)
+            dest = os.path.join(asset_folder, hashed_name)
+            _write_if_missing(dest, content)
+            if ext in COMPRESS_EXTENSIONS:
+                _write_if_missing(f"{dest}.gz", gzip.compress(content, compresslevel=9, mtime=0))
+                if brotli is not None:
+                    _write_if_missing(f"{dest}.br", brotli.compress(content, quality=11))
+
+            manifest[relative_path.replace(os.sep, '/')] = hashed_name
+
+    os.makedirs(asset_folder, exist_ok=True)
+    manifest_file = os.path.join(asset_folder, 'manifest.json')
+    tmp_file = f"{manifest_file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+    os.replace(tmp_file, manifest_file)
+    if manifest_file == MANIFEST_FILE:
+        # Don't rely on the manifest's mtime changing between quick rebuilds
+        _manifest_cache.update(mtime=os.path.getmtime(manifest_file), assets=manifest,
+                               hashed_names=set(manifest.values()))
+    return manifest
+
+def load_manifest():
+    """Load dist/manifest.json, re-reading it only when a build has replaced it."""
+    try:
+        mtime = os.path.getmtime(MANIFEST_FILE)
+    except OSError:
+        return {}
+    if _manifest_cache['mtime'] != mtime:
+        with open(MANIFEST_FILE, 'r') as f:
+            _manifest_cache['assets'] = json.load(f)
+        _manifest_cache['hashed_names'] = set(_manifest_cache['assets'].values())
+        _manifest_cache['mtime'] = mtime
+    return _manifest_cache['assets']
+
+
+# --- FLASK INTEGRATION ---
+def asset_url(filename):
+    """URL of the built asset for filename, or the plain static URL if it was not built."""
+    hashed_name = load_manifest().get(filename)
+    if hashed_name is None:
+        return url_for('static', filename=filename)
+    return f"{ASSET_URL_PREFIX}/{hashed_name}"
+
+def serve_asset(filename):
+    """Serve a fingerprinted asset, preferring a precompressed copy the client accepts.
+
+    Only hashed names listed in the manifest are served; the manifest itself
+    and the raw .gz/.br files are not reachable directly.
+    """
+    load_manifest()
+    if filename not in _manifest_cache['hashed_names']:
+        abort(404)
+
+    asset_folder = os.path.abspath(ASSET_FOLDER)
+    mimetype = mimetypes.guess_type(filename)[0]
+    response = None
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if request.accept_encodings[encoding] and os.path.isfile(os.path.join(asset_folder, filename + suffix)):
+            response = send_from_directory(asset_folder, filename + suffix, mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+            break
+    if response is None:
+        response = send_from_directory(asset_folder, filename, mimetype=mimetype)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    response.vary.add('Accept-Encoding')
+    return response
+
+def init_app(app):
+    """Build assets, then register the /assets/ route and the asset_url() template helper.
+
+    The build runs on every start rather than under __main__, so `flask run`
+    and WSGI servers get fingerprinted assets too. It rehashes every source
+    instead of trusting mtimes, and existing outputs are not rewritten.
+    """
+    try:
+        build_assets()
+    except OSError as e:
+        app.logger.warning("Asset build failed: %s", e)
+    if not load_manifest():
+        app.logger.warning("No built assets in %s; templates will use plain /static/ URLs. "
+                           "Run `python assets.py build`.", ASSET_FOLDER)
+    app.add_url_rule(f"{ASSET_URL_PREFIX}/<path:filename>", 'assets', serve_asset)
+    app.add_template_global(asset_url)
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] != ['build']:
+        print("Usage: python assets.py build")
+        sys.exit(1)
+    built = build_assets()
+    for name, hashed_name in sorted(built.items()):
+        print(f"{name} -> {hashed_name}")
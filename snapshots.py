@@ -0,0 +1,410 @@
+"""Point-in-time snapshots of the HRIS data file and uploaded CVs.
+
+Usage:
+    python snapshots.py create [--full]
+    python snapshots.py list
+    python snapshots.py verify [SNAPSHOT_ID]
+    python snapshots.py restore SNAPSHOT_ID [--target DIR]
+
+Every snapshot is a small manifest that points at content-addressed,
+gzip-compressed objects. A collection that did not change since the previous
+snapshot is carried over as a single reference. A list collection that did
+change is stored as a delta (new records plus copy ranges) against the
+previous snapshot's version, chained from a full base that is rewritten
+every MAX_DELTA_CHAIN runs. CV files are stored once by content, and the
+uploads index is kept as a delta the same way, so each run costs roughly
+the day's changes.
+"""
+import argparse
+import difflib
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+from datetime import datetime, timezone
+
+# --- CONFIGURATION ---
+DATA_FILE = 'data.json'
+UPLOAD_FOLDER = 'uploads'
+SNAPSHOT_FOLDER = 'snapshots'
+MANIFEST_FOLDER = os.path.join(SNAPSHOT_FOLDER, 'manifests')
+OBJECT_FOLDER = os.path.join(SNAPSHOT_FOLDER, 'objects')
+CHUNK_SIZE = 1024 * 1024
+MAX_DELTA_CHAIN = 14
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot is missing or damaged."""
+
+
+# --- HELPER FUNCTIONS ---
+def canonical_json(value):
+    """Serialize a value the same way every time so equal records hash equally.
+
+    Only used for hashing and diffing; stored objects keep the original key
+    order (see stored_json) so a restored data.json looks like the original.
+    """
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def stored_json(value):
+    """Compact JSON that keeps key order, used for stored objects and manifests."""
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def object_path(digest):
+    """Location of an object, fanned out by the first two hex digits."""
+    return os.path.join(OBJECT_FOLDER, digest[:2], digest)
+
+def atomic_write(path, write):
+    """Write a file through a temp file in the same folder, then rename it into place.
+
+    The temp file is created with open(), so the result gets the usual
+    umask-based permissions rather than a private 0600 mode.
+    """
+    folder = os.path.dirname(path) or '.'
+    os.makedirs(folder, exist_ok=True)
+    tmp_path = os.path.join(folder, f".tmp-{os.getpid()}-{threading.get_ident()}-{os.path.basename(path)}")
+    try:
+        with open(tmp_path, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def file_digest(path):
+    """sha256 of a file, read in chunks."""
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def put_bytes(raw):
+    """Store raw bytes as a compressed object unless it already exists.
+
+    Returns (digest, bytes_written); bytes_written is 0 for an existing object.
+    """
+    digest = hashlib.sha256(raw).hexdigest()
+    path = object_path(digest)
+    if os.path.exists(path):
+        return digest, 0
+    compressed = gzip.compress(raw)
+    atomic_write(path, lambda f: f.write(compressed))
+    return digest, len(compressed)
+
+def put_file(src):
+    """Store a file as a compressed object, streaming it. Returns (digest, bytes_written)."""
+    digest = file_digest(src)
+    path = object_path(digest)
+    if os.path.exists(path):
+        return digest, 0
+
+    def write(out):
+        with open(src, 'rb') as f, gzip.GzipFile(fileobj=out, mode='wb') as gz:
+            shutil.copyfileobj(f, gz, CHUNK_SIZE)
+
+    atomic_write(path, write)
+    return digest, os.path.getsize(path)
+
+def read_object(digest):
+    """Read and decompress an object, checking it against its digest."""
+    path = object_path(digest)
+    if not os.path.exists(path):
+        raise SnapshotError(f"Missing object {digest}")
+    with gzip.open(path, 'rb') as f:
+        raw = f.read()
+    if hashlib.sha256(raw).hexdigest() != digest:
+        raise SnapshotError(f"Corrupt object {digest}")
+    return raw
+
+def list_digest(parts):
+    """sha256 of a list given its records' canonical JSON, same as canonical_json(list)."""
+    return hashlib.sha256(b'[' + b','.join(parts) + b']').hexdigest()
+
+def diff_lists(old_parts, new_parts):
+    """Copy ranges turning old_parts into new_parts.
+
+    Returns ops of ['b', start, length] (from the old list) and
+    ['n', start, length] (from new_parts). The common prefix and suffix are
+    trimmed first so SequenceMatcher only sees the edited middle.
+    """
+    prefix = 0
+    limit = min(len(old_parts), len(new_parts))
+    while prefix < limit and old_parts[prefix] == new_parts[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old_parts[-1 - suffix] == new_parts[-1 - suffix]:
+        suffix += 1
+
+    ops = [['b', 0, prefix]]
+    old_end, new_end = len(old_parts) - suffix, len(new_parts) - suffix
+    matcher = difflib.SequenceMatcher(None, old_parts[prefix:old_end], new_parts[prefix:new_end], autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append(['b', prefix + i1, i2 - i1])
+        elif j2 > j1:
+            ops.append(['n', prefix + j1, j2 - j1])
+    ops.append(['b', old_end, suffix])
+    return [op for op in ops if op[2]]
+
+def store_list(items, parts, digest, previous):
+    """Store a list as a delta against the previous snapshot's version, or as a new base.
+
+    parts holds each record's canonical JSON. A delta lists the new records
+    plus copy ranges (['b', start, length] from the previous version,
+    ['n', start, length] from the new records), so appending to audit_log or
+    editing one candidate only stores what changed that day. Pure appends and
+    prepends are detected from hashes alone, without reading the previous
+    version back. Deltas chain from a full base; a new base is written once
+    the chain reaches MAX_DELTA_CHAIN or a delta covers more than half the
+    list. Returns (entry, bytes_written).
+    """
+    deltas = previous.get('deltas', []) if previous and 'base' in previous else None
+    if deltas is not None and len(deltas) < MAX_DELTA_CHAIN:
+        old_length = previous['length']
+        added = len(items) - old_length
+        if added >= 0 and list_digest(parts[added:]) == previous['hash']:
+            ops = [['n', 0, added], ['b', 0, old_length]]
+        elif added >= 0 and list_digest(parts[:old_length]) == previous['hash']:
+            ops = [['b', 0, old_length], ['n', old_length, added]]
+        else:
+            ops = diff_lists([canonical_json(r) for r in load_list(previous)], parts)
+
+        records = []
+        for op in ops:
+            if op[0] == 'n':
+                start = op[1]
+                op[1] = len(records)
+                records.extend(items[start:start + op[2]])
+        ops = [op for op in ops if op[2]]
+
+        if len(records) * 2 <= len(items):
+            delta_digest, written = put_bytes(stored_json({'records': records, 'ops': ops}))
+            entry = {'hash': digest, 'length': len(items), 'base': previous['base'],
+                     'deltas': deltas + [delta_digest]}
+            return entry, written
+
+    base_digest, written = put_bytes(stored_json(items))
+    return {'hash': digest, 'length': len(items), 'base': base_digest, 'deltas': []}, written
+
+def load_list(entry):
+    """Rebuild a list stored by store_list."""
+    items = json.loads(read_object(entry['base']))
+    for delta_digest in entry['deltas']:
+        delta = json.loads(read_object(delta_digest))
+        result = []
+        for source, start, length in delta['ops']:
+            result.extend((items if source == 'b' else delta['records'])[start:start + length])
+        items = result
+    if hashlib.sha256(canonical_json(items)).hexdigest() != entry['hash']:
+        raise SnapshotError(f"List does not match its checksum {entry['hash']}")
+    return items
+
+def load_collection(entry):
+    """Rebuild one data.json collection from its manifest entry."""
+    if 'base' in entry:
+        return load_list(entry)
+    return json.loads(read_object(entry['value']))
+
+def load_manifest(snapshot_id):
+    """Load a snapshot manifest by id."""
+    path = os.path.join(MANIFEST_FOLDER, f"{snapshot_id}.json.gz")
+    if not os.path.exists(path):
+        raise SnapshotError(f"Snapshot not found: {snapshot_id}")
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+def list_snapshots():
+    """Return all snapshot ids, oldest first."""
+    if not os.path.isdir(MANIFEST_FOLDER):
+        return []
+    return sorted(name[:-len('.json.gz')] for name in os.listdir(MANIFEST_FOLDER)
+                  if name.endswith('.json.gz'))
+
+def read_data_file():
+    """Read data.json in one go.
+
+    The app replaces data.json atomically on save, so a single read always
+    sees one complete version and writers never have to wait for us.
+    """
+    try:
+        with open(DATA_FILE, 'rb') as f:
+            raw = f.read()
+        return json.loads(raw)
+    except FileNotFoundError:
+        raise SnapshotError(f"{DATA_FILE} not found; nothing to snapshot")
+    except ValueError as e:
+        raise SnapshotError(f"{DATA_FILE} is not valid JSON: {e}")
+
+# --- SNAPSHOT OPERATIONS ---
+def create_snapshot(full=False):
+    """Take a snapshot of data.json and the uploads folder. Returns the manifest."""
+    existing = list_snapshots()
+    parent = load_manifest(existing[-1]) if existing and not full else None
+    parent_collections = parent['collections'] if parent else {}
+
+    stats = {'objects_written': 0, 'bytes_written': 0}
+
+    def track(written):
+        stats['objects_written'] += bool(written)
+        stats['bytes_written'] += written
+
+    collections = {}
+    for name, value in read_data_file().items():
+        previous = parent_collections.get(name)
+        if isinstance(value, list):
+            parts = [canonical_json(record) for record in value]
+            digest = list_digest(parts)
+        else:
+            digest = hashlib.sha256(canonical_json(value)).hexdigest()
+        if previous and previous['hash'] == digest:
+            collections[name] = previous
+            continue
+
+        if isinstance(value, list):
+            collections[name], written = store_list(value, parts, digest, previous)
+        else:
+            value_digest, written = put_bytes(stored_json(value))
+            collections[name] = {'hash': digest, 'value': value_digest}
+        track(written)
+
+    # Uploads are written once under a timestamped name, so an unchanged
+    # size and mtime means the stored object is still valid.
+    parent_uploads = {name: (file_hash, size, mtime)
+                      for name, file_hash, size, mtime in (load_list(parent['uploads']) if parent else [])}
+    upload_index = []
+    if os.path.isdir(UPLOAD_FOLDER):
+        for entry in sorted(os.scandir(UPLOAD_FOLDER), key=lambda e: e.name):
+            if not entry.is_file() or entry.name.startswith('.'):
+                continue
+            st = entry.stat()
+            previous = parent_uploads.get(entry.name)
+            if previous and previous[1:] == (st.st_size, st.st_mtime):
+                file_hash = previous[0]
+            else:
+                file_hash, written = put_file(entry.path)
+                track(written)
+            upload_index.append([entry.name, file_hash, st.st_size, st.st_mtime])
+
+    index_parts = [canonical_json(item) for item in upload_index]
+    index_digest = list_digest(index_parts)
+    if parent and parent['uploads']['hash'] == index_digest:
+        uploads = parent['uploads']
+    else:
+        uploads, written = store_list(upload_index, index_parts, index_digest,
+                                      parent['uploads'] if parent else None)
+        track(written)
+
+    snapshot_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    manifest = {
+        'id': snapshot_id,
+        'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'parent': parent['id'] if parent else None,
+        'kind': 'incremental' if parent else 'full',
+        'collections': collections,
+        'uploads': uploads,
+        'stats': stats,
+    }
+    path = os.path.join(MANIFEST_FOLDER, f"{snapshot_id}.json.gz")
+    compressed = gzip.compress(stored_json(manifest))
+    atomic_write(path, lambda f: f.write(compressed))
+    return manifest
+
+def verify_snapshot(snapshot_id):
+    """Check every object a snapshot refers to. Returns a list of problems."""
+    manifest = load_manifest(snapshot_id)
+    problems = []
+    for name, entry in manifest['collections'].items():
+        try:
+            load_collection(entry)
+        except SnapshotError as e:
+            problems.append(f"{name}: {e}")
+    try:
+        upload_index = load_list(manifest['uploads'])
+    except SnapshotError as e:
+        return problems + [f"uploads index: {e}"]
+    for filename, file_hash, _, _ in upload_index:
+        try:
+            read_object(file_hash)
+        except SnapshotError as e:
+            problems.append(f"{filename}: {e}")
+    return problems
+
+def restore_snapshot(snapshot_id, target='.'):
+    """Rebuild data.json and the uploads folder from a snapshot into target.
+
+    data.json is swapped in atomically, so a running app picks up the
+    restored data on its next read without being stopped.
+    """
+    manifest = load_manifest(snapshot_id)
+    data = {name: load_collection(entry) for name, entry in manifest['collections'].items()}
+
+    upload_folder = os.path.join(target, UPLOAD_FOLDER)
+    os.makedirs(upload_folder, exist_ok=True)
+    for filename, file_hash, _, _ in load_list(manifest['uploads']):
+        dest = os.path.join(upload_folder, filename)
+        if os.path.isfile(dest) and file_digest(dest) == file_hash:
+            continue
+        raw = read_object(file_hash)
+        atomic_write(dest, lambda f: f.write(raw))
+
+    atomic_write(os.path.join(target, DATA_FILE),
+                 lambda f: f.write(json.dumps(data, indent=4).encode('utf-8')))
+    return manifest
+
+# --- CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HRIS point-in-time snapshots")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    create_cmd = commands.add_parser('create', help="Take a new snapshot")
+    create_cmd.add_argument('--full', action='store_true', help="Ignore the previous snapshot")
+    commands.add_parser('list', help="List snapshots")
+    verify_cmd = commands.add_parser('verify', help="Verify one or all snapshots")
+    verify_cmd.add_argument('snapshot_id', nargs='?')
+    restore_cmd = commands.add_parser('restore', help="Restore a snapshot")
+    restore_cmd.add_argument('snapshot_id')
+    restore_cmd.add_argument('--target', default='.', help="Folder to restore into")
+
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'create':
+            manifest = create_snapshot(full=args.full)
+            stats = manifest['stats']
+            print(f"Created {manifest['kind']} snapshot {manifest['id']}: "
+                  f"{stats['objects_written']} new objects, {stats['bytes_written']} bytes")
+
+        elif args.command == 'list':
+            for snapshot_id in list_snapshots():
+                manifest = load_manifest(snapshot_id)
+                records = sum(entry.get('length', 1) for entry in manifest['collections'].values())
+                print(f"{snapshot_id}  {manifest['created_at']}  {manifest['kind']:<11}  "
+                      f"{records} records  {manifest['uploads']['length']} files")
+
+        elif args.command == 'verify':
+            snapshot_ids = [args.snapshot_id] if args.snapshot_id else list_snapshots()
+            failed = False
+            for snapshot_id in snapshot_ids:
+                problems = verify_snapshot(snapshot_id)
+                print(f"{snapshot_id}: {'OK' if not problems else 'FAILED'}")
+                for problem in problems:
+                    print(f"  {problem}")
+                failed = failed or bool(problems)
+            return 1 if failed else 0
+
+        elif args.command == 'restore':
+            restore_snapshot(args.snapshot_id, args.target)
+            print(f"Restored snapshot {args.snapshot_id} into {os.path.abspath(args.target)}")
+
+    except SnapshotError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+import gzip
+import mimetypes
+import os
+
+import pytest
+from flask import Flask
+
+import assets
+
+
+@pytest.mark.parametrize('source, expected', [
+    # Regex literals containing comment markers and quotes are kept intact
+    ("var r = /[/*]/g; var x = 1; /* c */ var y=2;", "var r = /[/*]/g; var x = 1; var y=2;\n"),
+    ("s.replace(/'/g, 'x'); var b = 'keep  two';", "s.replace(/'/g, 'x'); var b = 'keep  two';\n"),
+    ("return /x\\/y/.test(s) // end", "return /x\\/y/.test(s)\n"),
+    # Division is not mistaken for a regex
+    ("var a = b / c / d; i++ / 2", "var a = b / c / d; i++ / 2\n"),
+    # Template literal contents, including nested templates, are untouched
+    ("const t = `a  ${ {k: `n  ${x}`}.k }  b`;", "const t = `a  ${ {k: `n  ${x}`}.k }  b`;\n"),
+    ("const u = `line one\n    // not a comment\n`;", "const u = `line one\n    // not a comment\n`;\n"),
+    # Line breaks survive so automatic semicolon insertion is unchanged
+    ("if (a) {\n    // c\n    b()\n}\n/re/.test(x)", "if (a) {\nb()\n}\n/re/.test(x)\n"),
+])
+def test_minify_js(source, expected):
+    assert assets.minify_js(source) == expected
+
+
+def test_minify_css():
+    source = "/* header */\na :hover , b > c {\n    color: red;\n    content: \"  x  \";\n}\n"
+    assert assets.minify_css(source) == 'a :hover,b > c{color:red;content:"  x  "}'
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(assets.STATIC_FOLDER)
+    with open(os.path.join(assets.STATIC_FOLDER, 'script.js'), 'w') as f:
+        f.write("// comment\nfunction hello() {\n    return 'hi';\n}\n")
+
+    app = Flask(__name__)
+    assets.init_app(app)
+    return app.test_client()
+
+
+def test_init_app_builds_and_serves_precompressed(client):
+    manifest = assets.load_manifest()
+    hashed_name = manifest['script.js']
+    assert hashed_name.startswith('script.') and hashed_name != 'script.js'
+
+    with client.application.test_request_context():
+        assert assets.asset_url('script.js') == f"/assets/{hashed_name}"
+
+    response = client.get(f"/assets/{hashed_name}", headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Cache-Control'] == assets.CACHE_CONTROL
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert response.mimetype == mimetypes.guess_type('x.js')[0]
+    assert gzip.decompress(response.data) == b"function hello() {\nreturn 'hi';\n}\n"
+
+    cached = client.get(f"/assets/{hashed_name}", headers={
+        'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304
+
+    plain = client.get(f"/assets/{hashed_name}")
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.data == b"function hello() {\nreturn 'hi';\n}\n"
+
+
+def test_only_manifest_names_are_served(client):
+    hashed_name = assets.load_manifest()['script.js']
+    assert client.get('/assets/manifest.json').status_code == 404
+    assert client.get(f"/assets/{hashed_name}.gz").status_code == 404
+    assert client.get('/assets/script.js').status_code == 404
+
+
+def test_init_app_rebuilds_regardless_of_mtime(client):
+    old_name = assets.load_manifest()['script.js']
+    script = os.path.join(assets.STATIC_FOLDER, 'script.js')
+    old_mtime = os.path.getmtime(script)
+    with open(script, 'a') as f:
+        f.write("hello();\n")
+    # e.g. cp -p / rsync -a / Docker COPY leave an older mtime behind
+    os.utime(script, (old_mtime - 3600, old_mtime - 3600))
+    with open(os.path.join(assets.STATIC_FOLDER, 'extra.css'), 'w') as f:
+        f.write("a { color: red; }")
+
+    assets.init_app(Flask(__name__))
+    manifest = assets.load_manifest()
+    assert manifest['script.js'] != old_name
+    assert 'extra.css' in manifest
+
+    os.remove(os.path.join(assets.STATIC_FOLDER, 'extra.css'))
+    assets.init_app(Flask(__name__))
+    assert 'extra.css' not in assets.load_manifest()
@@ -0,0 +1,101 @@
+import json
+import os
+
+import snapshots
+
+
+def write_data(data):
+    with open(snapshots.DATA_FILE, 'w') as f:
+        json.dump(data, f)
+
+
+def test_incremental_round_trip(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(snapshots.UPLOAD_FOLDER)
+    data = {
+        "recruiters": ["Hassan", "Shaimaa"],
+        "candidates": [{"id": str(i), "name": f"Candidate {i}", "status": "New"} for i in range(200)],
+        "audit_log": [{"action": f"event {i}"} for i in range(100)],
+    }
+    write_data(data)
+    for name in ('a.pdf', 'b.pdf'):
+        with open(os.path.join(snapshots.UPLOAD_FOLDER, name), 'wb') as f:
+            f.write(b'same cv' * 100)
+
+    full = snapshots.create_snapshot()
+    assert full['kind'] == 'full'
+    # Identical CVs are stored once: one object per collection, the uploads
+    # index, and a single CV object
+    upload_index = snapshots.load_list(full['uploads'])
+    assert len(upload_index) == 2 and upload_index[0][1] == upload_index[1][1]
+    assert full['stats']['objects_written'] == len(data) + 2
+
+    unchanged = snapshots.create_snapshot()
+    assert unchanged['stats']['objects_written'] == 0
+    assert unchanged['collections'] == full['collections']
+
+    data['candidates'][10]['status'] = 'Hired'
+    data['audit_log'].insert(0, {"action": "hired candidate 10"})
+    write_data(data)
+    incremental = snapshots.create_snapshot()
+    assert incremental['kind'] == 'incremental'
+    # Only a delta is written for each changed list; the base is reused
+    assert incremental['collections']['candidates']['base'] == full['collections']['candidates']['base']
+    assert incremental['collections']['recruiters'] == full['collections']['recruiters']
+    assert incremental['stats']['objects_written'] == 2
+
+    # Later deltas are taken against the previous snapshot, not the base
+    data['audit_log'].insert(0, {"action": "interview booked"})
+    write_data(data)
+    daily = snapshots.create_snapshot()
+    assert len(daily['collections']['audit_log']['deltas']) == 2
+    assert daily['stats']['bytes_written'] <= incremental['stats']['bytes_written']
+    incremental = daily
+
+    assert snapshots.verify_snapshot(incremental['id']) == []
+
+    target = tmp_path / 'restore'
+    os.makedirs(target / snapshots.UPLOAD_FOLDER)
+    # An existing file of the right size but wrong contents must be replaced
+    with open(target / snapshots.UPLOAD_FOLDER / 'a.pdf', 'wb') as f:
+        f.write(b'x' * len(b'same cv' * 100))
+
+    snapshots.restore_snapshot(incremental['id'], str(target))
+
+    with open(target / snapshots.DATA_FILE) as f:
+        restored = json.load(f)
+    assert restored == data
+    # Collection and field order are kept, so exports keep their columns
+    assert list(restored) == list(data)
+    assert list(restored['candidates'][0]) == ['id', 'name', 'status']
+    for name in ('a.pdf', 'b.pdf'):
+        with open(target / snapshots.UPLOAD_FOLDER / name, 'rb') as f:
+            assert f.read() == b'same cv' * 100
+
+    snapshots.restore_snapshot(full['id'], str(target))
+    with open(target / snapshots.DATA_FILE) as f:
+        assert json.load(f)['candidates'][10]['status'] == 'New'
+
+
+def test_verify_reports_corrupt_object(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_data({"candidates": [{"id": "1"}]})
+    manifest = snapshots.create_snapshot()
+
+    path = snapshots.object_path(manifest['collections']['candidates']['base'])
+    with open(path, 'wb') as f:
+        f.write(b'')
+
+    problems = snapshots.verify_snapshot(manifest['id'])
+    assert problems and problems[0].startswith('candidates:')
+
+
+def test_create_without_valid_data_file(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    assert snapshots.main(['create']) == 1
+    assert 'not found' in capsys.readouterr().err
+
+    with open(snapshots.DATA_FILE, 'w') as f:
+        f.write('{broken')
+    assert snapshots.main(['create']) == 1
+    assert 'not valid JSON' in capsys.readouterr().err